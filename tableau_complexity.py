@@ -13,7 +13,8 @@ Usage (CLI):
 Library usage:
     from tableau_complexity import analyze_workbook
     results = analyze_workbook("/path/file.twbx")
-    # results is a list of dicts (one per worksheet)
+    # results is a list of WorksheetResult named tuples (one per worksheet);
+    # use r._asdict() for a plain dict
 
 Notes:
 - Tableau's XML schema is large and evolves over time. This utility uses
@@ -31,6 +32,9 @@ Notes:
 
 from __future__ import annotations
 import argparse
+import functools
+import mmap
+import os
 from pathlib import Path
 import zipfile
 import xml.etree.ElementTree as ET
@@ -38,34 +42,130 @@ import re
 import json
 import csv
 import datetime
+from collections import Counter
 import shutil
-from typing import Dict, Any, List, Optional, Tuple, Set
+import sys
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import IO, Callable, Dict, Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Set
+
+try:
+    # lxml is optional: when present we parse with libxml2 and evaluate
+    # precompiled XPath objects; otherwise fall back to the stdlib parser.
+    from lxml import etree as LET
+except ImportError:  # pragma: no cover - depends on the environment
+    LET = None
+
+try:
+    # orjson is optional: serializes JSON output in C straight to bytes.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    # pyahocorasick is optional: one linear scan finds any LOD/table-calc keyword.
+    import ahocorasick
+except ImportError:  # pragma: no cover - depends on the environment
+    ahocorasick = None
 
 
 # -----------------------------
 # XML helpers
 # -----------------------------
 
-def _read_twb_from_twbx(twbx_path: Path) -> str:
-    """Extract and return the first .twb file contents inside a .twbx archive."""
-    with zipfile.ZipFile(twbx_path, 'r') as zf:
-        # pick the first .twb we find (there's usually only one)
-        twb_names = [n for n in zf.namelist() if n.lower().endswith(".twb")]
-        if not twb_names:
-            raise ValueError("No .twb found inside the .twbx archive.")
-        with zf.open(twb_names[0], 'r') as f:
-            return f.read().decode("utf-8", errors="replace")
-
-
-def _load_xml(path: Path) -> ET.Element:
-    """Load the Tableau XML root element from .twb or .twbx"""
-    if path.suffix.lower() == ".twbx":
-        xml_text = _read_twb_from_twbx(path)
-    elif path.suffix.lower() == ".twb":
-        xml_text = path.read_text(encoding="utf-8", errors="replace")
+_WORKBOOK_SUFFIXES = (".twb", ".twbx")
+_TABLE_SUFFIXES = (".csv", ".tsv")
+
+def _twb_member_name(zf: zipfile.ZipFile) -> str:
+    """Return the name of the first .twb entry inside a .twbx archive."""
+    # pick the first .twb we find (there's usually only one)
+    name = next((n for n in zf.namelist() if n.lower().endswith(".twb")), None)
+    if name is None:
+        raise ValueError("No .twb found inside the .twbx archive.")
+    return name
+
+
+@contextmanager
+def _open_twb(path: Path) -> Iterator[Callable[[], IO[bytes]]]:
+    """
+    Yield a callable that opens a fresh binary stream over the workbook XML.
+    A .twbx archive is opened (and its .twb entry located) once, however many
+    passes read it; the entry is decompressed straight into the parser.
+    A .twb is memory-mapped, so each pass reads straight from the page cache.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".twbx":
+        with zipfile.ZipFile(path, 'r') as zf:
+            name = _twb_member_name(zf)
+            yield lambda: zf.open(name, 'r')
+    elif suffix == ".twb":
+        with path.open("rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap refuses empty files; let the parser report the error
+                yield lambda: path.open("rb")
+            else:
+                yield lambda: mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
     else:
         raise ValueError("Unsupported file type. Use .twb or .twbx")
-    return ET.fromstring(xml_text)
+
+
+def _iterparse(open_twb: Callable[[], IO[bytes]]) -> Iterator[Tuple[str, ET.Element]]:
+    """
+    Stream ("start"|"end", element) events for the workbook XML.
+    The document is never held as a string; callers free subtrees via _release().
+    """
+    with open_twb() as stream:
+        if LET is not None:
+            # Drop comments/PIs so lxml trees look like the ones ElementTree builds.
+            events = LET.iterparse(
+                stream, events=("start", "end"),
+                huge_tree=True, remove_comments=True, remove_pis=True,
+            )
+        else:
+            events = ET.iterparse(stream, events=("start", "end"))
+        yield from events
+
+
+def _release(elem: ET.Element, parent: Optional[ET.Element]) -> None:
+    """Drop a processed element so the partially built tree stays small."""
+    elem.clear()
+    if parent is not None:
+        parent.remove(elem)
+
+
+def _iter_worksheets(open_twb: Callable[[], IO[bytes]]) -> Iterator[ET.Element]:
+    """
+    Yield each fully built <worksheet> element in document order.
+    Everything outside the worksheet being built is released as soon as it closes,
+    and each worksheet is released once the caller moves on to the next one.
+    """
+    stack: List[ET.Element] = []
+    ws_depth = 0
+    for event, elem in _iterparse(open_twb):
+        if event == "start":
+            stack.append(elem)
+            if elem.tag == "worksheet":
+                ws_depth += 1
+            continue
+        stack.pop()
+        if elem.tag == "worksheet":
+            ws_depth -= 1
+            yield elem
+        if ws_depth == 0:
+            _release(elem, stack[-1] if stack else None)
+
+
+def _xpath(path: str) -> Callable[[ET.Element], List[ET.Element]]:
+    """Compile a descendant path once; returns a callable node -> [elements]."""
+    if LET is not None:
+        return LET.XPath(path)
+    # ElementTree caches compiled paths internally, so findall is the fallback.
+    return lambda node: node.findall(path)
+
+
+_XP_COLUMN = _xpath(".//column")
+_XP_CALC = _xpath(".//calculation")
 
 
 # -----------------------------
@@ -79,116 +179,150 @@ TABLE_CALC_FUNCS = [
 
 LOD_KEYWORDS = ["{FIXED", "{INCLUDE", "{EXCLUDE"]
 
-def _text_contains_any(text: str, needles: List[str]) -> bool:
-    t = text.upper()
-    return any(n in t for n in needles)
+def _keyword_matcher(needles: List[str]) -> Callable[[str], bool]:
+    """Build a predicate telling whether an upper-cased text contains any needle."""
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for n in needles:
+            automaton.add_word(n, n)
+        automaton.make_automaton()
+        return lambda text: next(automaton.iter(text), None) is not None
+    pattern = re.compile("|".join(re.escape(n) for n in needles))
+    return lambda text: pattern.search(text) is not None
 
-def _collect_calculation_expressions(root: ET.Element) -> List[str]:
-    exprs = []
-    for calc in root.findall(".//calculation"):
-        # Tableau often stores calc expression in the 'formula' attribute or text
-        formula = calc.get("formula") or (calc.text or "")
-        if formula:
-            exprs.append(formula)
-    return exprs
+_has_table_calc_keyword = _keyword_matcher(TABLE_CALC_FUNCS)
+_has_lod_keyword = _keyword_matcher(LOD_KEYWORDS)
 
-def _detect_has_table_calcs(exprs: List[str]) -> bool:
-    return any(_text_contains_any(e, TABLE_CALC_FUNCS) for e in exprs)
+def _calc_formula(calc: ET.Element) -> str:
+    # Tableau often stores calc expression in the 'formula' attribute or text
+    return calc.get("formula") or (calc.text or "")
 
-def _detect_has_lod(exprs: List[str]) -> bool:
-    return any(_text_contains_any(e, LOD_KEYWORDS) for e in exprs)
+def _worksheet_name(ws: ET.Element) -> str:
+    return ws.get("name") or ws.get("caption") or "(unnamed)"
 
-def _gather_parameters(root: ET.Element) -> List[str]:
-    # Parameters often appear under a <parameters> container with <parameter name="...">
-    params = []
-    for p in root.findall(".//parameters/parameter"):
-        name = p.get("name")
-        if name:
-            params.append(name)
-    # Also try to capture parameters referenced in calculations as [<Param Name>]
-    # This is best-effort; we do not attempt to disambiguate fields vs params here.
-    return sorted(set(params))
 
-def _worksheet_nodes(root: ET.Element) -> List[ET.Element]:
-    return root.findall(".//worksheet")
+@functools.lru_cache(maxsize=1024)
+def _local(tag: str) -> str:
+    # strip namespace if present: {ns}tag -> tag
+    # (Tableau's tag vocabulary is small, so the cache hit rate is ~100%)
+    if not tag:
+        return ""
+    _, sep, local = tag.rpartition("}")
+    return local if sep else tag
 
-def _worksheet_name(ws: ET.Element) -> str:
-    return ws.get("name") or ws.get("caption") or "(unnamed)"
 
+@dataclass
+class WorksheetScan:
+    """Per-worksheet raw material gathered by a single _walk_worksheet() pass."""
+    mark_types_raw: Set[str]
+    columns: List[ET.Element]
+    shelf_nodes: Dict[str, List[ET.Element]]
+    filter_count: int
 
-def _worksheet_mark_types(ws: ET.Element) -> List[str]:
-    """Return unique mark types using robust, namespace-agnostic heuristics.
-    Looks for:
-      - <mark type="...">
-      - any element with attribute mark="..."
-      - <style mark="...">
-      - <view mark="...">
-      - presence of map-related elements -> 'map'
+
+def _walk_worksheet(ws: ET.Element) -> WorksheetScan:
+    """
+    Walk the worksheet subtree once, collecting:
+      - raw mark types (see _worksheet_mark_types for the patterns)
+      - descendant <column> elements (fields and calculated fields)
+      - descendant <filter> count
+      - descendant shelf/encoding nodes (<rows>, <cols>, <color>, ...)
     """
     types: Set[str] = set()
+    columns: List[ET.Element] = []
+    shelf_nodes: Dict[str, List[ET.Element]] = {k: [] for k in SHELF_TAGS_MULTI + SHELF_TAGS_SINGLE}
+    filter_count = 0
 
-    def _local(tag: str) -> str:
-        # strip namespace if present: {ns}tag -> tag
-        if tag and "}" in tag:
-            return tag.split("}", 1)[1]
-        return tag or ""
-
-    # Walk all descendants once
     for el in ws.iter():
         tag = _local(el.tag).lower()
+        a = el.attrib
+        m = a.get("mark")
         # direct mark element with type attr
-        t_attr = el.get("type") or el.get("mark") or ""
+        t_attr = a.get("type") or m or ""
         if tag in ("mark", "marks", "style", "view") and t_attr:
             types.add(t_attr.strip().lower())
         # any element with a 'mark' attribute
-        m = el.get("mark")
         if m:
             types.add(m.strip().lower())
         # map detection
-        if tag in ("map", "layers") or el.get("map") is not None:
+        if tag in ("map", "layers") or "map" in a:
             types.add("map")
 
+        # descendant buckets (exact tag match, like findall(".//tag"))
+        if el is ws:
+            continue
+        if el.tag == "column":
+            columns.append(el)
+        elif el.tag == "filter":
+            filter_count += 1
+        else:
+            nodes = shelf_nodes.get(el.tag)
+            if nodes is not None:
+                nodes.append(el)
+
+    return WorksheetScan(
+        mark_types_raw=types,
+        columns=columns,
+        shelf_nodes=shelf_nodes,
+        filter_count=filter_count,
+    )
+
+
+# Raw mark strings (after separator normalization) -> canonical mark type
+_MARK_SYNONYMS = {
+    "bar": "bar",
+    "line": "line",
+    "area": "area",
+    "shape": "shape",
+    "text": "text",
+    "gantt": "gantt",
+    "polygon": "polygon",
+    "circle": "scatter",
+    "square": "scatter",
+    "pie": "pie",
+    "heatmap": "heatmap",
+    "density": "density",
+    "boxandwhisker": "box-and-whisker",
+    "box-and-whisker": "box-and-whisker",
+    "box": "box-and-whisker",
+    "map": "map",
+    "automatic": "automatic",
+}
+
+# "_" and " " become "-"; anything else outside [a-z-] is dropped
+_MARK_SEPARATORS = str.maketrans("_ ", "--")
+_MARK_INVALID_RE = re.compile(r"[^a-z\-]")
+
+def _worksheet_mark_types(scan: WorksheetScan, name: str) -> List[str]:
+    """Return unique mark types using robust, namespace-agnostic heuristics.
+    Looks for:
+      - <mark type="...">
+      - any element with attribute mark="..."
+      - <style mark="...">
+      - <view mark="...">
+      - presence of map-related elements -> 'map'
+    """
     # Normalize synonyms
-    synonyms = {
-        "bar": "bar",
-        "line": "line",
-        "area": "area",
-        "shape": "shape",
-        "text": "text",
-        "gantt": "gantt",
-        "polygon": "polygon",
-        "circle": "scatter",
-        "square": "scatter",
-        "pie": "pie",
-        "heatmap": "heatmap",
-        "density": "density",
-        "boxandwhisker": "box-and-whisker",
-        "box-and-whisker": "box-and-whisker",
-        "box": "box-and-whisker",
-        "map": "map",
-        "automatic": "automatic",
-    }
     normalized: Set[str] = set()
-    for t in list(types):
-        base = t.replace("_", "-").replace(" ", "-")
-        base = re.sub(r"[^a-z\-]", "", base)
-        normalized.add(synonyms.get(base, base))
+    for t in scan.mark_types_raw:
+        base = _MARK_INVALID_RE.sub("", t.translate(_MARK_SEPARATORS))
+        normalized.add(sys.intern(_MARK_SYNONYMS.get(base, base)))
 
     
     # Fallback inference if still empty
     if not normalized:
         # Shelf-based inference
         def count_cols(node_name: str) -> int:
-            node = ws.find(f".//{node_name}")
-            return len(node.findall(".//column")) if node is not None else 0
+            nodes = scan.shelf_nodes[node_name]
+            return len(_XP_COLUMN(nodes[0])) if nodes else 0
         n_rows = count_cols("rows")
         n_cols = count_cols("cols")
-        name = (_worksheet_name(ws) or "").lower()
+        name = (name or "").lower()
 
         if n_rows == 0 and n_cols == 0:
-            has_color = ws.find(".//color") is not None
-            has_size = ws.find(".//size") is not None
-            has_shape = ws.find(".//shape") is not None
+            has_color = bool(scan.shelf_nodes["color"])
+            has_size = bool(scan.shelf_nodes["size"])
+            has_shape = bool(scan.shelf_nodes["shape"])
             if "text" in name:
                 normalized.add("text")
             elif has_shape:
@@ -200,7 +334,7 @@ def _worksheet_mark_types(ws: ET.Element) -> List[str]:
                 normalized.add("text")
         else:
             # With axes, make a weak guess based on field roles and names
-            fields = _worksheet_field_refs(ws)
+            fields = _worksheet_field_refs(scan)
             tokens = " ".join(f.lower() for f in fields)
             if any(k in tokens for k in ["bin(", "hist", "bucket"]):
                 normalized.add("histogram")
@@ -214,24 +348,21 @@ def _worksheet_mark_types(ws: ET.Element) -> List[str]:
     return sorted(normalized) if normalized else ["unknown"]
 
 
-def _worksheet_filter_count(ws: ET.Element) -> int:
-    return len(ws.findall(".//filter"))
-
-def _worksheet_field_refs(ws: ET.Element) -> Set[str]:
+def _worksheet_field_refs(scan: WorksheetScan) -> Set[str]:
     """Collect unique field names referenced by the worksheet pills/columns."""
     fields: Set[str] = set()
-    # Many worksheets list fields under <view><columns><column field="[Field Name]">
-    for col in ws.findall(".//column"):
-        field = col.get("field") or col.get("name")
+    # Many worksheets list fields under <view><columns><column field="[Field Name]">;
+    # <shelf><column> forms are descendants too, so one pass covers both.
+    for col in scan.columns:
+        a = col.attrib
+        field = a.get("field") or a.get("name")
         if field:
-            fields.add(field.strip())
-    # Also catch <shelf><column> forms
-    for col in ws.findall(".//shelf//column"):
-        field = col.get("field") or col.get("name")
-        if field:
-            fields.add(field.strip())
+            fields.add(sys.intern(field.strip()))
     return fields
 
+AGG_FUNC_RE = re.compile(r"(SUM|AVG|MIN|MAX|COUNT|MEDIAN|STDEV|VAR)\s*\(", re.IGNORECASE)
+MEASURE_TOKEN_RE = re.compile(r"#|AMOUNT|PRICE|COST|QUANTITY|MEASURE")
+
 def _count_dimensions_measures(field_names: Set[str]) -> Tuple[int, int]:
     """
     Heuristic: dimensions often have a leading [dim:] or are non-aggregated.
@@ -242,50 +373,87 @@ def _count_dimensions_measures(field_names: Set[str]) -> Tuple[int, int]:
     This is imperfect; tune if you can map field role metadata from your TWB.
     """
     dim, meas = 0, 0
-    agg_pattern = re.compile(r"(SUM|AVG|MIN|MAX|COUNT|MEDIAN|STDEV|VAR)\s*\(", re.IGNORECASE)
     for f in field_names:
         # strip brackets if present
         inner = f.strip("[]")
-        if agg_pattern.search(inner):
+        if AGG_FUNC_RE.search(inner):
             meas += 1
         else:
             # If it looks like a numeric calc or has known measure tokens, count as measure
-            if any(tok in inner.upper() for tok in ["#", "AMOUNT", "PRICE", "COST", "QUANTITY", "MEASURE"]):
+            if MEASURE_TOKEN_RE.search(inner.upper()):
                 meas += 1
             else:
                 dim += 1
     return dim, meas
 
-def _collect_calc_library(root: ET.Element) -> Dict[str, str]:
-    """Build a mapping of friendly calc names -> formulas for quick lookup."""
+def _scan_workbook(open_twb: Callable[[], IO[bytes]]) -> Dict[str, Any]:
+    """
+    First streaming pass over the whole workbook. Collects:
+      - a workbook-level LOD flag over every <calculation> expression
+        (keyword checks stop at the first LOD; nothing is accumulated)
+      - parameter names from <parameters>/<parameter>
+      - a calc library mapping friendly calc names -> formulas
+    Elements are released as they close, except a column's <calculation>
+    children, which are kept until the column itself closes.
+    """
+    has_lod = False
+    params: Set[str] = set()
     library: Dict[str, str] = {}
-    for col in root.findall(".//column"):
-        calc_node = col.find("calculation")
-        formula = calc_node.get("formula") if calc_node is not None else None
-        if not formula:
-            formula = calc_node.text if calc_node is not None else None
-        if not formula:
+    stack: List[ET.Element] = []
+
+    for event, elem in _iterparse(open_twb):
+        if event == "start":
+            stack.append(elem)
             continue
-        keys: Set[str] = set()
-        for attr in ("name", "caption"):
-            raw = col.get(attr)
-            if raw:
-                keys.add(raw.strip())
-                friendly = _friendly_field_name(raw)
-                if friendly:
-                    keys.add(friendly)
-        for key in keys:
-            if key:
-                library[key] = formula
-    return library
+        stack.pop()
+        parent = stack[-1] if stack else None
+        tag = elem.tag
+
+        if tag == "calculation":
+            if not has_lod:
+                formula = _calc_formula(elem)
+                if formula:
+                    has_lod = _has_lod_keyword(formula.upper())
+            if parent is not None and parent.tag == "column":
+                continue
+        elif tag == "parameter":
+            # Parameters often appear under a <parameters> container with <parameter name="...">
+            name = elem.get("name")
+            if name and parent is not None and parent.tag == "parameters":
+                params.add(sys.intern(name))
+        elif tag == "column":
+            calc_node = elem.find("calculation")
+            formula = _calc_formula(calc_node) if calc_node is not None else ""
+            if formula:
+                keys: Set[str] = set()
+                for attr in ("name", "caption"):
+                    raw = elem.get(attr)
+                    if raw:
+                        keys.add(raw.strip())
+                        friendly = _friendly_field_name(raw)
+                        if friendly:
+                            keys.add(friendly)
+                for key in keys:
+                    if key:
+                        library[key] = formula
+
+        _release(elem, parent)
+
+    return {
+        "has_lod": has_lod,
+        # This is best-effort; we do not attempt to disambiguate fields vs params here.
+        "parameters": sorted(params),
+        "calc_library": library,
+    }
 
 FORMULA_FUNC_RE = re.compile(r"\b([A-Z_][A-Z0-9_]+)\s*\(")
 
-def _calc_formula_complexity(formula: str) -> float:
-    """Heuristic complexity score for a Tableau calc formula."""
+def _calc_formula_complexity(formula: str, normalized: Optional[str] = None) -> float:
+    """Heuristic complexity score for a Tableau calc formula (normalized = formula.upper())."""
     if not formula:
         return 0.0
-    normalized = formula.upper()
+    if normalized is None:
+        normalized = formula.upper()
     length_score = min(len(formula) / 80.0, 4.0)
     func_hits = FORMULA_FUNC_RE.findall(normalized)
     func_score = min(len(func_hits) * 0.35, 4.0)
@@ -296,33 +464,54 @@ def _calc_formula_complexity(formula: str) -> float:
     conditional_score += normalized.count(" THEN ") * 0.2
     nesting_depth = normalized.count("(")
     nesting_score = min(max(nesting_depth - 4, 0) * 0.15, 3.5)
-    lod_bonus = 1.0 if _detect_has_lod([formula]) else 0.0
-    table_calc_bonus = 0.8 if _detect_has_table_calcs([formula]) else 0.0
+    lod_bonus = 1.0 if _has_lod_keyword(normalized) else 0.0
+    table_calc_bonus = 0.8 if _has_table_calc_keyword(normalized) else 0.0
     score = length_score + func_score + conditional_score + nesting_score + lod_bonus + table_calc_bonus
     return round(score, 2)
 
-def _worksheet_calc_details(ws: ET.Element, calc_library: Dict[str, str]) -> Dict[str, Any]:
+def _formula_metrics(formula: str, cache: Dict[str, Tuple[float, bool]]) -> Tuple[float, bool]:
+    """
+    Return (formula_complexity, has_table_calc) for a formula, memoized in a
+    per-workbook cache: the same calc is usually repeated in the
+    datasource-dependencies of many worksheets.
+    """
+    metrics = cache.get(formula)
+    if metrics is None:
+        normalized = formula.upper()
+        metrics = (_calc_formula_complexity(formula, normalized), _has_table_calc_keyword(normalized))
+        cache[formula] = metrics
+    return metrics
+
+def _worksheet_calc_details(
+    scan: WorksheetScan,
+    calc_library: Dict[str, str],
+    formula_cache: Optional[Dict[str, Tuple[float, bool]]] = None,
+) -> Dict[str, Any]:
     """
     Return details about calculations referenced in a worksheet.
     Includes resolved formulas + per-formula complexity metrics.
     """
+    if formula_cache is None:
+        formula_cache = {}
     details: List[Dict[str, Any]] = []
     exprs: List[str] = []
+    has_table_calc = False
     seen_pairs: Set[Tuple[str, str]] = set()
 
-    for col in ws.findall(".//column"):
-        field_ref = col.get("field") or col.get("name") or col.get("column") or ""
-        friendly = col.get("caption") or col.get("alias") or ""
+    for col in scan.columns:
+        a = col.attrib
+        field_ref = a.get("field") or a.get("name") or a.get("column") or ""
+        friendly = a.get("caption") or a.get("alias") or ""
         if not friendly:
             friendly = _friendly_field_name(field_ref)
         formulas: List[str] = []
 
-        for calc in col.findall(".//calculation"):
-            formula = calc.get("formula") or (calc.text or "")
+        for calc in _XP_CALC(col):
+            formula = _calc_formula(calc)
             if formula:
                 formulas.append(formula)
 
-        formula_attr = col.get("formula")
+        formula_attr = a.get("formula")
         if formula_attr:
             formulas.append(formula_attr)
 
@@ -330,24 +519,25 @@ def _worksheet_calc_details(ws: ET.Element, calc_library: Dict[str, str]) -> Dic
             formulas.append(calc_library[friendly])
 
         for formula in formulas:
-            formula = formula.strip()
+            # Interned: the same calc text recurs across worksheets and workbooks
+            formula = sys.intern(formula.strip())
             if not formula:
                 continue
             key = (friendly or field_ref, formula)
             if key in seen_pairs:
                 continue
             seen_pairs.add(key)
-            complexity = _calc_formula_complexity(formula)
+            complexity, is_table_calc = _formula_metrics(formula, formula_cache)
+            has_table_calc = has_table_calc or is_table_calc
             exprs.append(formula)
             details.append({
-                "field": friendly or field_ref.strip(),
+                "field": sys.intern(friendly or field_ref.strip()),
                 "formula": formula,
                 "formula_complexity": complexity,
             })
 
     total_complexity = round(sum(d["formula_complexity"] for d in details), 2)
     avg_complexity = round(total_complexity / len(details), 2) if details else 0.0
-    has_table_calc = _detect_has_table_calcs(exprs)
 
     return {
         "count": len(details),
@@ -378,11 +568,13 @@ def _score_complexity(
     """
     Simple weighted score. Tune weights for your environment.
     """
-    weights = cfg.get("weights", DEFAULT_CONFIG["weights"]).copy()
+    # Read-only: no per-call copies of the (nested) weights dict
+    weights = cfg.get("weights", DEFAULT_CONFIG["weights"])
     # ensure mark_bonus exists
-    if "mark_bonus" not in weights:
-        weights["mark_bonus"] = DEFAULT_CONFIG["weights"]["mark_bonus"].copy()
-    # Start of weights = {
+    if "mark_bonus" in weights:
+        mark_bonus = weights["mark_bonus"]
+    else:
+        mark_bonus = DEFAULT_CONFIG["weights"]["mark_bonus"]
 
     score = (
         dims * weights["dims"]
@@ -396,7 +588,7 @@ def _score_complexity(
         + shelf_density * 0.5
     )
     if mark_types:
-        mb = sum(weights["mark_bonus"].get(m, 0.6) for m in mark_types) / len(mark_types)
+        mb = sum(mark_bonus.get(m, 0.6) for m in mark_types) / len(mark_types)
         score += mb
     return round(score, 2)
 
@@ -490,10 +682,11 @@ def _dedupe_preserve_order(values: List[str]) -> List[str]:
     for v in values:
         if v and v not in seen:
             seen.add(v)
-            deduped.append(v)
+            # Shelf field names repeat across worksheets; keep one copy of each
+            deduped.append(sys.intern(v))
     return deduped
 
-def _extract_shelves(ws: ET.Element) -> Dict[str, List[str]]:
+def _extract_shelves(scan: WorksheetScan) -> Dict[str, List[str]]:
     """
     Return a dict of shelves -> list of human-friendly field names.
     Rows/Cols can have multiple <column>. Other encodings are typically single.
@@ -503,11 +696,13 @@ def _extract_shelves(ws: ET.Element) -> Dict[str, List[str]]:
     def _extract_from_node(node: ET.Element) -> List[str]:
         vals: List[str] = []
         # Attributes (column/field/name) take precedence
-        attr = node.get("column") or node.get("field") or node.get("name") or node.get("value")
+        a = node.attrib
+        attr = a.get("column") or a.get("field") or a.get("name") or a.get("value")
         vals.extend(_normalize_field_tokens(attr))
         # <column> children (used on rows/cols) carry their own attrs/text
-        for col in node.findall(".//column"):
-            raw = col.get("field") or col.get("name") or col.get("column") or (col.text or "")
+        for col in _XP_COLUMN(node):
+            ca = col.attrib
+            raw = ca.get("field") or ca.get("name") or ca.get("column") or (col.text or "")
             vals.extend(_normalize_field_tokens(raw))
         # Raw text expressions in shelves like <rows>[Field]/[Field]</rows>
         text_bits = "".join(node.itertext()).strip()
@@ -518,14 +713,14 @@ def _extract_shelves(ws: ET.Element) -> Dict[str, List[str]]:
     # Multi-item shelves (rows/cols): list all child <column> attributes and inline expressions
     for shelf in SHELF_TAGS_MULTI:
         vals: List[str] = []
-        for node in ws.findall(f".//{shelf}"):
+        for node in scan.shelf_nodes[shelf]:
             vals.extend(_extract_from_node(node))
         shelves[shelf] = _dedupe_preserve_order(vals)
 
     # Single-item shelves (encodings): gather every attribute reference
     for shelf in SHELF_TAGS_SINGLE:
         vals: List[str] = []
-        for node in ws.findall(f".//{shelf}"):
+        for node in scan.shelf_nodes[shelf]:
             vals.extend(_extract_from_node(node))
         shelves[shelf] = _dedupe_preserve_order(vals)
 
@@ -615,82 +810,126 @@ def load_config(config_path: Optional[str]) -> Dict[str, Any]:
 # Public API
 # -----------------------------
 
-def analyze_workbook(path_str: str, config_path: Optional[str] = None) -> List[Dict[str, Any]]:
+class WorksheetResult(NamedTuple):
     """
-    Analyze a Tableau .twb or .twbx and return per-worksheet dictionaries.
+    Per-worksheet metrics returned by analyze_workbook.
+    A named tuple keeps corpus-scale result sets compact; rows are turned
+    into dicts only at the JSON/CSV/report boundary (see _as_dicts).
+    """
+    worksheet: str
+    mark_types: List[str]
+    rows: List[str]
+    cols: List[str]
+    color: List[str]
+    size: List[str]
+    shape: List[str]
+    label: List[str]
+    tooltip: List[str]
+    detail: List[str]
+    path: List[str]
+    text_shelf: List[str]
+    angle: List[str]
+    opacity: List[str]
+    shelf_density: int
+    shelf_channels_used: List[str]
+    num_fields_used: int
+    num_dimensions_est: int
+    num_measures_est: int
+    num_filters: int
+    num_calculated_fields_est: int
+    has_table_calc_ws: bool
+    has_lod_anywhere: bool
+    num_parameters: int
+    calculated_fields: List[Dict[str, Any]]
+    calc_formula_complexity_total: float
+    calc_formula_complexity_avg: float
+    complexity_score: float
+
+
+# Column order for tabular output, so CSV/TSV columns are stable across runs.
+WORKSHEET_FIELDS = list(WorksheetResult._fields)
+SUMMARY_FIELDS = [
+    "overall_score", "num_worksheets", "max_score", "min_score",
+    "total_calc_fields", "formula_complexity_total", "formula_complexity_avg",
+]
+
+def analyze_workbook(path_str: str, config_path: Optional[str] = None) -> List[WorksheetResult]:
+    """
+    Analyze a Tableau .twb or .twbx and return per-worksheet results.
     """
     path = Path(path_str)
-    root = _load_xml(path)
 
     cfg = load_config(config_path)
 
-    # workbook-level derived info
-    all_exprs = _collect_calculation_expressions(root)
-    has_lod = _detect_has_lod(all_exprs)
-    has_table_calc_any = _detect_has_table_calcs(all_exprs)
-    params = _gather_parameters(root)
-    calc_library = _collect_calc_library(root)
-
-    results: List[Dict[str, Any]] = []
-
-    for ws in _worksheet_nodes(root):
-        name = _worksheet_name(ws)
-        mark_types = _worksheet_mark_types(ws)
-        num_filters = _worksheet_filter_count(ws)
-        fields = _worksheet_field_refs(ws)
-        dims, meas = _count_dimensions_measures(fields)
-        calc_info = _worksheet_calc_details(ws, calc_library)
-        num_calcs = calc_info["count"]
-        has_table_calc_ws = calc_info["has_table_calc"]
-
-        shelves = _extract_shelves(ws)
-        density = _compute_shelf_density(shelves, cfg)
-
-        score = _score_complexity(
-            dims=dims,
-            meas=meas,
-            num_filters=num_filters,
-            num_calcs=num_calcs,
-            has_table_calc=bool(has_table_calc_ws),
-            has_lod=has_lod,  # workbook-level signal
-            num_params=len(params),
-            mark_types=mark_types,
-            shelf_density=density.get("shelf_density", 0),
-            calc_formula_complexity=calc_info["total_complexity"],
-            cfg=cfg,
-        )
+    with _open_twb(path) as open_twb:
+        # workbook-level derived info (first pass)
+        wb_info = _scan_workbook(open_twb)
+        has_lod = wb_info["has_lod"]
+        params = wb_info["parameters"]
+        calc_library = wb_info["calc_library"]
+        formula_cache: Dict[str, Tuple[float, bool]] = {}
+
+        results: List[WorksheetResult] = []
+
+        # per-worksheet metrics (second pass, one worksheet in memory at a time)
+        for ws in _iter_worksheets(open_twb):
+            name = _worksheet_name(ws)
+            scan = _walk_worksheet(ws)
+            mark_types = _worksheet_mark_types(scan, name)
+            num_filters = scan.filter_count
+            fields = _worksheet_field_refs(scan)
+            dims, meas = _count_dimensions_measures(fields)
+            calc_info = _worksheet_calc_details(scan, calc_library, formula_cache)
+            num_calcs = calc_info["count"]
+            has_table_calc_ws = calc_info["has_table_calc"]
+
+            shelves = _extract_shelves(scan)
+            density = _compute_shelf_density(shelves, cfg)
+
+            score = _score_complexity(
+                dims=dims,
+                meas=meas,
+                num_filters=num_filters,
+                num_calcs=num_calcs,
+                has_table_calc=bool(has_table_calc_ws),
+                has_lod=has_lod,  # workbook-level signal
+                num_params=len(params),
+                mark_types=mark_types,
+                shelf_density=density.get("shelf_density", 0),
+                calc_formula_complexity=calc_info["total_complexity"],
+                cfg=cfg,
+            )
 
-        results.append({
-            "worksheet": name,
-            "mark_types": mark_types,
-            "rows": shelves.get("rows", []),
-            "cols": shelves.get("cols", []),
-            "color": shelves.get("color", []),
-            "size": shelves.get("size", []),
-            "shape": shelves.get("shape", []),
-            "label": shelves.get("label", []),
-            "tooltip": shelves.get("tooltip", []),
-            "detail": shelves.get("detail", []),
-            "path": shelves.get("path", []),
-            "text_shelf": shelves.get("text", []),
-            "angle": shelves.get("angle", []),
-            "opacity": shelves.get("opacity", []),
-            "shelf_density": density.get("shelf_density", 0),
-            "shelf_channels_used": density.get("shelf_channels_used", []),
-
-            "num_fields_used": len(fields),
-            "num_dimensions_est": dims,
-            "num_measures_est": meas,
-            "num_filters": num_filters,
-            "num_calculated_fields_est": num_calcs,
-            "has_table_calc_ws": bool(has_table_calc_ws),
-            "has_lod_anywhere": has_lod,
-            "num_parameters": len(params),
-            "calculated_fields": calc_info["details"],
-            "calc_formula_complexity_total": calc_info["total_complexity"],
-            "calc_formula_complexity_avg": calc_info["avg_complexity"],
-            "complexity_score": score,
-        })
+            results.append(WorksheetResult(
+                worksheet=name,
+                mark_types=mark_types,
+                rows=shelves.get("rows", []),
+                cols=shelves.get("cols", []),
+                color=shelves.get("color", []),
+                size=shelves.get("size", []),
+                shape=shelves.get("shape", []),
+                label=shelves.get("label", []),
+                tooltip=shelves.get("tooltip", []),
+                detail=shelves.get("detail", []),
+                path=shelves.get("path", []),
+                text_shelf=shelves.get("text", []),
+                angle=shelves.get("angle", []),
+                opacity=shelves.get("opacity", []),
+                shelf_density=density.get("shelf_density", 0),
+                shelf_channels_used=density.get("shelf_channels_used", []),
+                num_fields_used=len(fields),
+                num_dimensions_est=dims,
+                num_measures_est=meas,
+                num_filters=num_filters,
+                num_calculated_fields_est=num_calcs,
+                has_table_calc_ws=bool(has_table_calc_ws),
+                has_lod_anywhere=has_lod,
+                num_parameters=len(params),
+                calculated_fields=calc_info["details"],
+                calc_formula_complexity_total=calc_info["total_complexity"],
+                calc_formula_complexity_avg=calc_info["avg_complexity"],
+                complexity_score=score,
+            ))
 
     return results
 
@@ -701,7 +940,7 @@ def analyze_workbook(path_str: str, config_path: Optional[str] = None) -> List[D
 # Summary helpers
 # -----------------------------
 
-def compute_summary(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+def compute_summary(rows: List[WorksheetResult]) -> Dict[str, Any]:
     """Compute an overall workbook summary from per-worksheet rows."""
     if not rows:
         return {
@@ -713,9 +952,9 @@ def compute_summary(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
             "formula_complexity_total": 0.0,
             "formula_complexity_avg": 0.0,
         }
-    scores = [r.get("complexity_score", 0) for r in rows]
-    total_calc_fields = sum(r.get("num_calculated_fields_est", 0) for r in rows)
-    formula_complexity_total = round(sum(r.get("calc_formula_complexity_total", 0.0) for r in rows), 2)
+    scores = [r.complexity_score for r in rows]
+    total_calc_fields = sum(r.num_calculated_fields_est for r in rows)
+    formula_complexity_total = round(sum(r.calc_formula_complexity_total for r in rows), 2)
     formula_complexity_avg = round(formula_complexity_total / total_calc_fields, 2) if total_calc_fields else 0.0
     return {
         "overall_score": round(sum(scores) / len(scores), 2),
@@ -737,69 +976,54 @@ def analyze_workbook_with_summary(path_str: str, config_path: Optional[str] = No
 
 
 # -----------------------------
-# Directory helpers
+# Directory analysis
 # -----------------------------
 
-def analyze_directory(dir_path: str) -> List[Dict[str, Any]]:
-    """
-    Analyze all .twb and .twbx files in a directory (non-recursive).
-    Returns a list of {"workbook": filename, "summary": {...}, "worksheets": [...]} dicts.
-    """
-    p = Path(dir_path)
-    if not p.is_dir():
-        raise ValueError(f"{dir_path} is not a directory")
-    results = []
-    for f in sorted(p.iterdir()):
-        if f.suffix.lower() in (".twb", ".twbx"):
-            try:
-                wb_result = analyze_workbook_with_summary(str(f))
-                wb_result["workbook"] = f.name
-                results.append(wb_result)
-            except Exception as e:
-                results.append({
-                    "workbook": f.name,
-                    "error": str(e),
-                })
-    return results
-
+def _safe_analyze(path_str: str, config_path: Optional[str] = None) -> Dict[str, Any]:
+    """Analyze one workbook, turning failures into an error record (pool worker entry point)."""
+    name = Path(path_str).name
+    try:
+        data = analyze_workbook_with_summary(path_str, config_path=config_path)
+        data["workbook"] = name
+        return data
+    except Exception as e:
+        # Include a failure record so batch runs are robust
+        return {
+            "workbook": name,
+            "summary": {"overall_score": 0.0, "num_worksheets": 0, "max_score": 0.0, "min_score": 0.0},
+            "worksheets": [],
+            "error": str(e),
+        }
 
 
-# -----------------------------
-# Directory analysis
-# -----------------------------
-
-def analyze_directory(dir_path_str: str, recursive: bool = False, config_path: Optional[str] = None) -> List[Dict[str, Any]]:
+def analyze_directory(dir_path_str: str, recursive: bool = False, config_path: Optional[str] = None, workers: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Analyze all .twb and .twbx files in a directory.
+    Workbooks are parsed in parallel worker processes (``workers`` defaults to
+    the CPU count; 1 analyzes in-process). Results keep sorted file order.
     Returns a list of {'workbook': <name>, 'summary': {...}, 'worksheets': [...]}
     """
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be a positive integer, got {workers}")
     base = Path(dir_path_str)
     if not base.is_dir():
         raise ValueError(f"Not a directory: {dir_path_str}")
-    patterns = ["*.twb", "*.twbx"]
-    files: List[Path] = []
-    if recursive:
-        for pat in patterns:
-            files.extend(base.rglob(pat))
-    else:
-        for pat in patterns:
-            files.extend(base.glob(pat))
-
-    results: List[Dict[str, Any]] = []
-    for f in sorted(files):
-        try:
-            data = analyze_workbook_with_summary(str(f), config_path=config_path)
-            data["workbook"] = f.name
-            results.append(data)
-        except Exception as e:
-            # Include a failure record so batch runs are robust
-            results.append({
-                "workbook": f.name,
-                "summary": {"overall_score": 0.0, "num_worksheets": 0, "max_score": 0.0, "min_score": 0.0},
-                "worksheets": [],
-                "error": str(e),
-            })
-    return results
+    # One directory walk, filtering on the name, instead of one glob per extension
+    candidates = base.rglob("*") if recursive else base.iterdir()
+    files = sorted(
+        f for f in candidates
+        if f.name.lower().endswith(_WORKBOOK_SUFFIXES) and f.is_file()
+    )
+    max_workers = workers if workers is not None else (os.cpu_count() or 1)
+    if max_workers <= 1 or len(files) <= 1:
+        return [_safe_analyze(str(f), config_path) for f in files]
+
+    by_file: Dict[Path, Dict[str, Any]] = {}
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(files))) as ex:
+        futures = {ex.submit(_safe_analyze, str(f), config_path): f for f in files}
+        for fut in as_completed(futures):
+            by_file[futures[fut]] = fut.result()
+    return [by_file[f] for f in files]
 
 
 
@@ -824,49 +1048,49 @@ def compute_corpus_summary(dir_results: List[Dict[str, Any]]) -> Dict[str, Any]:
             "errors_count": 0,
             "top_mark_types": [],
         }
-    import statistics as _stats
-
     num_workbooks = len(dir_results)
     errors_count = sum(1 for r in dir_results if r.get("error"))
     summaries = [r.get("summary", {}) for r in dir_results if r.get("summary")]
     overall_scores = [s.get("overall_score", 0.0) for s in summaries]
 
-    all_ws = []
+    # Single pass over every worksheet, accumulating running totals
+    # instead of materializing one list per metric.
+    total_worksheets = 0
+    score_sum = 0.0
+    table_calc_count = 0
+    lod_count = 0
+    shelf_density_sum = 0
+    total_calc_fields = 0
+    formula_complexity_sum = 0.0
+    mt_counter: Counter = Counter()
     for r in dir_results:
-        all_ws.extend(r.get("worksheets", []))
-
-    total_worksheets = len(all_ws)
-    worksheet_scores = [ws.get("complexity_score", 0.0) for ws in all_ws]
-    has_table_calc = [bool(ws.get("has_table_calc_ws")) for ws in all_ws]
-    has_lod_anywhere = [bool(ws.get("has_lod_anywhere")) for ws in all_ws]
-    total_calc_fields = sum(ws.get("num_calculated_fields_est", 0) for ws in all_ws)
-    formula_complexity_total = round(sum(ws.get("calc_formula_complexity_total", 0.0) for ws in all_ws), 2)
+        for ws in r.get("worksheets", []):
+            total_worksheets += 1
+            score_sum += ws.complexity_score
+            table_calc_count += ws.has_table_calc_ws
+            lod_count += ws.has_lod_anywhere
+            shelf_density_sum += ws.shelf_density
+            total_calc_fields += ws.num_calculated_fields_est
+            formula_complexity_sum += ws.calc_formula_complexity_total
+            mt_counter.update(ws.mark_types)
+
+    formula_complexity_total = round(formula_complexity_sum, 2)
     formula_complexity_avg = round(formula_complexity_total / total_calc_fields, 2) if total_calc_fields else 0.0
-
-    # mark types
-    from collections import Counter
-    mt_counter = Counter()
-    for ws in all_ws:
-        mts = ws.get("mark_types", [])
-        if isinstance(mts, list):
-            mt_counter.update(mts)
-        elif isinstance(mts, str) and mts:
-            mt_counter.update(mts.split(";"))
     top_mark_types = mt_counter.most_common(10)
 
-    def _safe_mean(vals):
-        return round(sum(vals) / len(vals), 2) if vals else 0.0
+    def _safe_mean(total, count):
+        return round(total / count, 2) if count else 0.0
 
     corpus = {
         "num_workbooks": num_workbooks,
         "total_worksheets": total_worksheets,
-        "overall_score_avg": _safe_mean(overall_scores),
+        "overall_score_avg": _safe_mean(sum(overall_scores), len(overall_scores)),
         "overall_score_min": round(min(overall_scores), 2) if overall_scores else 0.0,
         "overall_score_max": round(max(overall_scores), 2) if overall_scores else 0.0,
-        "worksheet_complexity_avg": _safe_mean(worksheet_scores),
-        "worksheets_with_table_calc_pct": round((sum(has_table_calc) / total_worksheets) * 100, 1) if total_worksheets else 0.0,
-        "worksheets_with_lod_pct": round((sum(has_lod_anywhere) / total_worksheets) * 100, 1) if total_worksheets else 0.0,
-        "shelf_density_avg": _safe_mean([ws.get("shelf_density", 0) for ws in all_ws]),
+        "worksheet_complexity_avg": _safe_mean(score_sum, total_worksheets),
+        "worksheets_with_table_calc_pct": round((table_calc_count / total_worksheets) * 100, 1) if total_worksheets else 0.0,
+        "worksheets_with_lod_pct": round((lod_count / total_worksheets) * 100, 1) if total_worksheets else 0.0,
+        "shelf_density_avg": _safe_mean(shelf_density_sum, total_worksheets),
         "errors_count": errors_count,
         "top_mark_types": top_mark_types,
         "total_calc_fields": total_calc_fields,
@@ -902,7 +1126,7 @@ def _prepare_workbook_report(data: Dict[str, Any], workbook_label: str) -> Dict[
     summary = data.get("summary", {})
     rows = []
     for ws in data.get("worksheets", []):
-        row = dict(ws)
+        row = ws._asdict()
         row["workbook"] = workbook_label
         rows.append(row)
     return {
@@ -922,7 +1146,7 @@ def _prepare_directory_report(dir_results: List[Dict[str, Any]]) -> Dict[str, An
             "summary": item.get("summary", {}),
         })
         for ws in item.get("worksheets", []):
-            row = dict(ws)
+            row = ws._asdict()
             row["workbook"] = wb_name
             all_ws.append(row)
     all_ws.sort(key=lambda r: r.get("complexity_score", 0.0), reverse=True)
@@ -962,54 +1186,104 @@ def _render_report(payload: Dict[str, Any], report_path: Path) -> None:
 # CLI
 # -----------------------------
 
+LIST_FIELDS = ["mark_types","rows","cols","color","size","shape","label","tooltip","detail","path","text_shelf","angle","opacity","shelf_channels_used"]
+
+def _json_bytes(data: Any) -> bytes:
+    """Serialize to indented UTF-8 JSON (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _as_dicts(data: Any) -> Any:
+    """
+    Convert WorksheetResult rows to dicts for serialization. Accepts a bare
+    row, a list of rows (analyze_workbook), a {'summary', 'worksheets'}
+    workbook result, or a list of workbook results (analyze_directory).
+    """
+    if isinstance(data, WorksheetResult):
+        return data._asdict()
+    if isinstance(data, list):
+        return [_as_dicts(item) for item in data]
+    if isinstance(data, dict) and "worksheets" in data:
+        return {**data, "worksheets": [_as_dicts(ws) for ws in data["worksheets"]]}
+    return data
+
+
+def _format_calculated_fields(items: List[Dict[str, Any]]) -> str:
+    formatted = []
+    for item in items:
+        field = item.get("field", "")
+        formula = (item.get("formula") or "").replace("\n", " ").strip()
+        if field:
+            formatted.append(f"{field}: {formula}")
+        else:
+            formatted.append(formula)
+    return " | ".join(formatted)
+
+
+# Positions of the fields _csv_row flattens (rows are tuples in WORKSHEET_FIELDS order)
+_LIST_FIELD_IDX = [WORKSHEET_FIELDS.index(k) for k in LIST_FIELDS]
+_CALC_FIELDS_IDX = WORKSHEET_FIELDS.index("calculated_fields")
+
+def _csv_row(ws: WorksheetResult) -> List[Any]:
+    """Return worksheet values in WORKSHEET_FIELDS order, list fields joined into CSV-friendly strings."""
+    row = list(ws)
+    for i in _LIST_FIELD_IDX:
+        if isinstance(row[i], list):
+            row[i] = ";".join(row[i])
+    if isinstance(row[_CALC_FIELDS_IDX], list):
+        row[_CALC_FIELDS_IDX] = _format_calculated_fields(row[_CALC_FIELDS_IDX])
+    return row
+
+
+def _summary_row(summary: Dict[str, Any]) -> List[Any]:
+    return [summary.get(k, "") for k in SUMMARY_FIELDS]
+
+
+def _write_table(path: Path, fieldnames: List[str], rows: Iterable[Sequence[Any]], delim: str) -> None:
+    """Write pre-serialized rows (value sequences in fieldnames order) as CSV/TSV in one writerows call."""
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=delim)
+        writer.writerow(fieldnames)
+        writer.writerows(rows)
+
+
+def _write_directory_output(data: List[Dict[str, Any]], out_path: Path) -> Path:
+    """
+    Write directory results as a worksheets table (all workbooks) plus a
+    per-workbook summaries sidecar. Returns the summaries path.
+    """
+    delim = "," if out_path.suffix.lower() == ".csv" else "\t"
+    results = [d for d in data if "worksheets" in d]
+    # Worksheets (rows are generated lazily straight into the writer)
+    if any(d["worksheets"] for d in results):
+        ws_rows = (
+            _csv_row(ws) + [d.get("workbook")]
+            for d in results
+            for ws in d["worksheets"]
+        )
+        _write_table(out_path, WORKSHEET_FIELDS + ["workbook"], ws_rows, delim)
+    # Summaries
+    sum_path = out_path.with_name(out_path.stem + "_summaries" + out_path.suffix)
+    if results:
+        sm_rows = ([d.get("workbook")] + _summary_row(d.get("summary", {})) for d in results)
+        _write_table(sum_path, ["workbook"] + SUMMARY_FIELDS, sm_rows, delim)
+    return sum_path
+
+
 def _write_output(data: Any, out_path: Path) -> None:
-    if out_path.suffix.lower() == ".json":
-        out_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
-    elif out_path.suffix.lower() in (".csv", ".tsv"):
-        delim = "," if out_path.suffix.lower() == ".csv" else "\t"
+    suffix = out_path.suffix.lower()
+    if suffix == ".json":
+        out_path.write_bytes(_json_bytes(_as_dicts(data)))
+    elif suffix in _TABLE_SUFFIXES:
+        delim = "," if suffix == ".csv" else "\t"
 
         # Directory case: list of workbook dicts
         if isinstance(data, list):
-            # Worksheets CSV
-            ws_rows = []
-            sm_rows = []
-            for item in data:
-                wb = item.get("workbook")
-                summary = item.get("summary", {})
-                worksheets = item.get("worksheets", [])
-                if summary:
-                    sm = dict(summary)
-                    sm["workbook"] = wb
-                    sm_rows.append(sm)
-                for r in worksheets:
-                    rr = dict(r)
-                    rr["workbook"] = wb
-                    if isinstance(rr.get("mark_types"), list):
-                        rr["mark_types"] = ";".join(rr["mark_types"])
-                    ws_rows.append(rr)
-
-            # Write worksheets CSV to the requested path
-            ws_fields = list({k for r in ws_rows for k in r.keys()}) if ws_rows else ["workbook"]
-            with out_path.open("w", newline="", encoding="utf-8") as f:
-                w = csv.DictWriter(f, fieldnames=ws_fields, delimiter=delim)
-                w.writeheader()
-                for r in ws_rows:
-                    w.writerow(r)
-
-            # Write summaries CSV as sidecar
-            sm_path = out_path.with_name(out_path.stem + "_summaries" + out_path.suffix)
-            if sm_rows:
-                sm_fields = list({k for r in sm_rows for k in r.keys()})
-            else:
-                sm_fields = ["workbook","overall_score","num_worksheets","max_score","min_score"]
-            with sm_path.open("w", newline="", encoding="utf-8") as f:
-                w = csv.DictWriter(f, fieldnames=sm_fields, delimiter=delim)
-                w.writeheader()
-                for r in sm_rows:
-                    w.writerow(r)
+            _write_directory_output(data, out_path)
             return
 
-        delim = "," if out_path.suffix.lower() == ".csv" else "\t"
         if isinstance(data, dict) and "worksheets" in data:
             rows = data.get("worksheets", [])
             summary = data.get("summary", {})
@@ -1018,56 +1292,29 @@ def _write_output(data: Any, out_path: Path) -> None:
             summary = None
 
         # Worksheet CSV
-        if rows:
-            fieldnames: List[str] = list(rows[0].keys())
-            for r in rows[1:]:
-                for key in r.keys():
-                    if key not in fieldnames:
-                        fieldnames.append(key)
-        else:
-            fieldnames = [
-                "worksheet", "mark_types", "num_fields_used", "num_dimensions_est",
-                "num_measures_est", "num_filters", "num_calculated_fields_est",
-                "has_table_calc_ws", "has_lod_anywhere", "num_parameters",
-                "complexity_score"
-            ]
-        with out_path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=delim)
-            writer.writeheader()
-            for r in rows or []:
-                r = dict(r)
-
-                # flatten list fields
-                for key in ["mark_types","rows","cols","color","size","shape","label","tooltip","detail","path","text_shelf","angle","opacity","shelf_channels_used"]:
-                    if isinstance(r.get(key), list):
-                        r[key] = ";".join(r[key])
-                if isinstance(r.get("calculated_fields"), list):
-                    formatted = []
-                    for item in r["calculated_fields"]:
-                        field = item.get("field", "")
-                        formula = (item.get("formula") or "").replace("\n", " ").strip()
-                        if field:
-                            formatted.append(f"{field}: {formula}")
-                        else:
-                            formatted.append(formula)
-                    r["calculated_fields"] = " | ".join(formatted)
-
-                writer.writerow(r)
+        _write_table(out_path, WORKSHEET_FIELDS, (_csv_row(r) for r in rows or []), delim)
 
         # Summary sidecar outputs
         if summary is not None:
             # JSON sidecar
             out_json = out_path.with_name(out_path.stem + "_summary.json")
-            out_json.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+            out_json.write_bytes(_json_bytes(summary))
             # CSV sidecar (one row)
             out_csv = out_path.with_name(out_path.stem + "_summary" + out_path.suffix)
-            with out_csv.open("w", newline="", encoding="utf-8") as f:
-                s_writer = csv.DictWriter(f, fieldnames=list(summary.keys()), delimiter=delim)
-                s_writer.writeheader()
-                s_writer.writerow(summary)
+            _write_table(out_csv, SUMMARY_FIELDS, [_summary_row(summary)], delim)
     else:
         raise ValueError("Unsupported output extension. Use .json, .csv, or .tsv")
 
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be >= 1."""
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {n}")
+    return n
+
 def main():
     parser = argparse.ArgumentParser(description="Analyze Tableau workbook complexity.")
     parser.add_argument("workbook", help="Path to .twb/.twbx or a directory containing them")
@@ -1075,73 +1322,27 @@ def main():
     parser.add_argument("--recursive", action="store_true", help="When INPUT is a directory, recurse into subfolders.")
     parser.add_argument("--config", help="Path to config JSON with weights/channel settings.", default=None)
     parser.add_argument("--report", help="Path to an HTML report to generate.", default=None)
+    parser.add_argument("--workers", type=_positive_int, default=None, help="Worker processes for directory mode, >= 1 (default: the CPU count; 1 runs in-process).")
     args = parser.parse_args()
 
     target = Path(args.workbook)
     report_path = Path(args.report) if args.report else None
     if target.is_dir():
-        data = analyze_directory(str(target), recursive=args.recursive, config_path=args.config)
+        data = analyze_directory(str(target), recursive=args.recursive, config_path=args.config, workers=args.workers)
         if args.out:
             out_path = Path(args.out)
-            if out_path.suffix.lower() == ".json":
-                out_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            suffix = out_path.suffix.lower()
+            if suffix == ".json":
+                _write_output(data, out_path)
                 print(f"Wrote {len(data)} workbook results to {out_path}")
-            elif out_path.suffix.lower() in (".csv", ".tsv"):
+            elif suffix in _TABLE_SUFFIXES:
                 # Write worksheets CSV and summaries CSV
-                delim = "," if out_path.suffix.lower() == ".csv" else "\t"
-                all_rows = []
-                summaries = []
-                for d in data:
-                    if "worksheets" in d:
-                        for ws in d["worksheets"]:
-                            row = dict(ws)
-                            row["workbook"] = d.get("workbook")
-                            all_rows.append(row)
-                        summaries.append({
-                            "workbook": d.get("workbook"),
-                            **d.get("summary", {})
-                        })
-                # Worksheets
-                if all_rows:
-                    ws_fields: List[str] = list(all_rows[0].keys())
-                    for row in all_rows[1:]:
-                        for key in row.keys():
-                            if key not in ws_fields:
-                                ws_fields.append(key)
-                    with out_path.open("w", newline="", encoding="utf-8") as f:
-                        w = csv.DictWriter(f, fieldnames=ws_fields, delimiter=delim)
-                        w.writeheader()
-                        for r in all_rows:
-                            if isinstance(r.get("mark_types"), list):
-                                r["mark_types"] = ";".join(r["mark_types"])
-                            for key in ["rows","cols","color","size","shape","label","tooltip","detail","path","text_shelf","angle","opacity","shelf_channels_used"]:
-                                if isinstance(r.get(key), list):
-                                    r[key] = ";".join(r[key])
-                            if isinstance(r.get("calculated_fields"), list):
-                                formatted = []
-                                for item in r["calculated_fields"]:
-                                    field = item.get("field", "")
-                                    formula = (item.get("formula") or "").replace("\n", " ").strip()
-                                    if field:
-                                        formatted.append(f"{field}: {formula}")
-                                    else:
-                                        formatted.append(formula)
-                                r["calculated_fields"] = " | ".join(formatted)
-                            w.writerow(r)
-                # Summaries
-                sum_path = out_path.with_name(out_path.stem + "_summaries" + out_path.suffix)
-                if summaries:
-                    sum_fields = list(summaries[0].keys())
-                    with sum_path.open("w", newline="", encoding="utf-8") as f:
-                        w = csv.DictWriter(f, fieldnames=sum_fields, delimiter=delim)
-                        w.writeheader()
-                        for r in summaries:
-                            w.writerow(r)
+                sum_path = _write_directory_output(data, out_path)
                 print(f"Wrote worksheets to {out_path} and summaries to {sum_path}")
             else:
                 raise ValueError("Unsupported output extension. Use .json, .csv, or .tsv")
         else:
-            print(json.dumps(data, indent=2))
+            print(json.dumps(_as_dicts(data), indent=2))
         if report_path:
             payload = _build_report_payload(
                 mode="directory",
@@ -1157,12 +1358,12 @@ def main():
             _write_output(data, out_path)
             n = len(data.get("worksheets", []))
             print(f"Wrote {n} worksheet rows + summary to {out_path}")
-            if out_path.suffix.lower() in (".csv", ".tsv"):
+            if out_path.suffix.lower() in _TABLE_SUFFIXES:
                 side_json = out_path.with_name(out_path.stem + "_summary.json")
                 side_csv = out_path.with_name(out_path.stem + "_summary" + out_path.suffix)
                 print(f"Summary also saved to {side_json.name} and {side_csv.name}")
         else:
-            print(json.dumps(data, indent=2))
+            print(json.dumps(_as_dicts(data), indent=2))
         if report_path:
             payload = _build_report_payload(
                 mode="workbook",